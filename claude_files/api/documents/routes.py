@@ -3,7 +3,8 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List
-from pathlib import Path
+import logging
+import os
 
 from .services import DocumentService
 from .websocket import manager
@@ -11,8 +12,14 @@ from .schemas import DocumentResponse, DocumentUploadRequest, ChunkResponse
 # from src.database import get_db  # Import your database dependency
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
+# Upload file types accepted by upload_document
+ALLOWED_EXTENSIONS = frozenset({'.pdf', '.docx', '.pptx', '.txt', '.doc'})
+ALLOWED_EXTENSIONS_TEXT = ', '.join(sorted(ALLOWED_EXTENSIONS))
+
 
 # Placeholder for database dependency - replace with your actual implementation
 async def get_db():
@@ -36,13 +43,12 @@ async def upload_document(
     Connect to WebSocket endpoint for real-time progress updates.
     """
     # Validate file type
-    allowed_extensions = {'.pdf', '.docx', '.pptx', '.txt', '.doc'}
-    file_ext = Path(file.filename).suffix.lower()
+    file_ext = os.path.splitext(file.filename)[1].lower()
     
-    if file_ext not in allowed_extensions:
+    if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"File type {file_ext} not supported. Allowed: {', '.join(allowed_extensions)}"
+            detail=f"File type {file_ext} not supported. Allowed: {ALLOWED_EXTENSIONS_TEXT}"
         )
     
     # Initialize service
@@ -94,8 +100,8 @@ async def websocket_endpoint(websocket: WebSocket, document_id: str):
             
     except WebSocketDisconnect:
         manager.disconnect(websocket, document_id)
-    except Exception as e:
-        print(f"WebSocket error: {e}")
+    except Exception:
+        logger.warning("WebSocket error", exc_info=True)
         manager.disconnect(websocket, document_id)
 
 
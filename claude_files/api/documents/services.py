@@ -1,17 +1,21 @@
 """Document service layer for handling uploads and processing."""
 
-from typing import Optional
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, raiseload
 from fastapi import UploadFile
 from pathlib import Path
 from datetime import datetime
-import shutil
+import aiofiles
 import uuid
 
 from src.preprocessing.pipeline import DocumentPreprocessingPipeline
 from .websocket import manager
 
 
+# Read size used when streaming uploads to disk (4 MB)
+UPLOAD_CHUNK_SIZE = 1 << 22
+
+
 class DocumentService:
     """Service for document upload and processing operations."""
     
@@ -49,14 +53,14 @@ class DocumentService:
         from src.models.document import Document
         
         # Save file to storage
-        storage_path = await self._save_file(file, project_id)
+        storage_path, file_size = await self._save_file(file, project_id)
         
         # Create document record
         document = Document(
             project_id=project_id,
             filename=file.filename,
             file_type=file.content_type,
-            file_size_bytes=file.size if hasattr(file, 'size') else 0,
+            file_size_bytes=file_size,
             storage_path=str(storage_path),
             document_type=document_type,
             processing_status="pending",
@@ -106,16 +110,16 @@ class DocumentService:
         
         return result
     
-    async def _save_file(self, file: UploadFile, project_id: str) -> Path:
+    async def _save_file(self, file: UploadFile, project_id: str) -> Tuple[Path, int]:
         """
-        Save uploaded file to storage.
+        Stream uploaded file to storage without blocking the event loop.
         
         Args:
             file: Uploaded file
             project_id: Project UUID
             
         Returns:
-            Path to saved file
+            Tuple of (path to saved file, bytes written)
         """
         # Create project directory
         project_dir = self.storage_path / project_id
@@ -127,11 +131,14 @@ class DocumentService:
         unique_filename = f"{timestamp}_{uuid.uuid4().hex[:8]}{file_ext}"
         file_path = project_dir / unique_filename
         
-        # Save file
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save file in large chunks
+        file_size = 0
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
+                file_size += len(chunk)
         
-        return file_path
+        return file_path, file_size
     
     def get_document(self, document_id: str):
         """Get document by ID."""
@@ -142,10 +149,18 @@ class DocumentService:
         ).first()
     
     def get_document_chunks(self, document_id: str, limit: Optional[int] = None):
-        """Get chunks for a document."""
+        """
+        Get chunks for a document.
+        
+        Relationships are never lazy-loaded: ChunkResponse only reads
+        column attributes, and raiseload turns any accidental per-row
+        relationship access into an error instead of an n+1 query.
+        """
         from src.models.document import DocumentChunk
         
-        query = self.db.query(DocumentChunk).filter(
+        query = self.db.query(DocumentChunk).options(
+            raiseload('*')
+        ).filter(
             DocumentChunk.document_id == document_id
         ).order_by(DocumentChunk.chunk_index)
         
@@ -154,6 +169,19 @@ class DocumentService:
         
         return query.all()
     
+    def bulk_insert_chunks(self, chunks: List):
+        """
+        Persist many chunks with a single bulk INSERT.
+        
+        Args:
+            chunks: DocumentChunk instances to save
+        """
+        if not chunks:
+            return
+        
+        self.db.bulk_save_objects(chunks)
+        self.db.commit()
+    
     async def soft_delete_document(self, document_id: str):
         """Soft delete a document."""
         from src.models.document import Document
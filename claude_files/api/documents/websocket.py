@@ -1,21 +1,60 @@
 """WebSocket manager for real-time document processing updates."""
 
-from typing import Dict, Set
-from fastapi import WebSocket
+from contextlib import suppress
+from typing import Dict, List, Optional, Set
+from fastapi import WebSocket, WebSocketDisconnect
+import asyncio
 import json
+import logging
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum time to wait on a single client before treating it as dead
+SEND_TIMEOUT_SECONDS = 5.0
+
+# Maximum number of pending messages per client; oldest are dropped first
+SEND_QUEUE_SIZE = 64
+
+# How often coalesced progress updates are flushed to clients
+FLUSH_INTERVAL_SECONDS = 0.1
+
+# Stages that bypass coalescing and are delivered immediately
+TERMINAL_STAGES = frozenset({"complete", "failed"})
+
+
+def _dumps(data: Dict) -> str:
+    """Serialize a message to JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data)
 
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time updates."""
     
     def __init__(self):
-        # Map document_id -> set of WebSocket connections
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        # Map document_id -> {WebSocket connection: outgoing message queue}
+        self.active_connections: Dict[str, Dict[WebSocket, asyncio.Queue]] = {}
+        # Map WebSocket connection -> task draining its queue
+        self._senders: Dict[WebSocket, asyncio.Task] = {}
+        # Latest pending progress update per document (last value wins)
+        self._latest: Dict[str, Dict] = {}
+        self._dirty: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
     
     async def connect(self, websocket: WebSocket, document_id: str):
         """
         Accept and register a new WebSocket connection.
         
+        Each connection gets its own bounded queue and a long-lived sender
+        task, so producers never await a slow client directly.
+        
         Args:
             websocket: WebSocket connection
             document_id: Document ID to track
@@ -23,9 +62,13 @@ class ConnectionManager:
         await websocket.accept()
         
         if document_id not in self.active_connections:
-            self.active_connections[document_id] = set()
+            self.active_connections[document_id] = {}
         
-        self.active_connections[document_id].add(websocket)
+        queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.active_connections[document_id][websocket] = queue
+        self._senders[websocket] = asyncio.create_task(
+            self._sender(websocket, document_id, queue)
+        )
     
     def disconnect(self, websocket: WebSocket, document_id: str):
         """
@@ -36,15 +79,24 @@ class ConnectionManager:
             document_id: Document ID being tracked
         """
         if document_id in self.active_connections:
-            self.active_connections[document_id].discard(websocket)
+            self.active_connections[document_id].pop(websocket, None)
             
             # Clean up if no more connections for this document
             if not self.active_connections[document_id]:
                 del self.active_connections[document_id]
+        
+        # Stop the sender task unless it is the one disconnecting itself
+        sender = self._senders.pop(websocket, None)
+        if sender is not None and sender is not asyncio.current_task():
+            sender.cancel()
     
     async def send_progress(self, document_id: str, data: Dict):
         """
-        Send progress update to all connections tracking a document.
+        Queue a progress update for all connections tracking a document.
+        
+        Intermediate updates are coalesced per document and flushed every
+        FLUSH_INTERVAL_SECONDS, so clients only see the newest state.
+        Terminal stages are delivered immediately.
         
         Args:
             document_id: Document ID
@@ -53,16 +105,18 @@ class ConnectionManager:
         if document_id not in self.active_connections:
             return
         
-        # Create copy to avoid modification during iteration
-        connections = self.active_connections[document_id].copy()
+        if data.get('stage') in TERMINAL_STAGES:
+            # Supersedes any pending intermediate update
+            self._latest.pop(document_id, None)
+            self._dirty.discard(document_id)
+            self._send_now(document_id, data)
+            return
         
-        for connection in connections:
-            try:
-                await connection.send_json(data)
-            except Exception as e:
-                # Connection failed, remove it
-                print(f"Failed to send to connection: {e}")
-                self.disconnect(connection, document_id)
+        self._latest[document_id] = data
+        self._dirty.add(document_id)
+        
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
     
     async def broadcast(self, data: Dict):
         """
@@ -71,8 +125,110 @@ class ConnectionManager:
         Args:
             data: Data to broadcast
         """
-        for document_id in list(self.active_connections.keys()):
-            await self.send_progress(document_id, data)
+        # One encode serves every connection across all documents
+        payload = _dumps(data)
+        queues = [
+            queue
+            for connections in list(self.active_connections.values())
+            for queue in list(connections.values())
+        ]
+        self._enqueue(queues, payload)
+    
+    def _send_now(self, document_id: str, data: Dict):
+        """
+        Enqueue a message for a document's connections without coalescing.
+        
+        Args:
+            document_id: Document ID
+            data: Progress data to send
+        """
+        if document_id not in self.active_connections:
+            return
+        
+        # Serialize once and reuse the text for every connection
+        payload = _dumps(data)
+        self._enqueue(list(self.active_connections[document_id].values()), payload)
+    
+    async def _flush_loop(self):
+        """Periodically deliver coalesced updates until none are pending."""
+        while self._dirty:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            
+            dirty, self._dirty = self._dirty, set()
+            for document_id in dirty:
+                data = self._latest.pop(document_id, None)
+                if data is not None:
+                    self._send_now(document_id, data)
+    
+    def _enqueue(self, queues: List[asyncio.Queue], payload: str):
+        """
+        Put a payload on each queue, dropping the oldest message when full.
+        
+        Args:
+            queues: Outgoing queues to write to
+            payload: JSON text to send
+        """
+        for queue in queues:
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Stale progress is worthless; keep the newest update
+                queue.get_nowait()
+                queue.put_nowait(payload)
+    
+    async def _sender(self, websocket: WebSocket, document_id: str, queue: asyncio.Queue):
+        """
+        Drain a connection's queue until a send fails or it is cancelled.
+        
+        A connection whose send fails or times out is removed and closed
+        with code 1011, so the client notices and can reconnect instead of
+        silently receiving nothing.
+        
+        Args:
+            websocket: WebSocket connection
+            document_id: Document ID being tracked
+            queue: Outgoing message queue for this connection
+        """
+        while True:
+            payload = await queue.get()
+            if not await self._safe_send(websocket, payload):
+                break
+        
+        self.disconnect(websocket, document_id)
+        
+        # The socket may already be gone; closing is best effort
+        with suppress(Exception):
+            await asyncio.wait_for(
+                websocket.close(code=1011),
+                timeout=SEND_TIMEOUT_SECONDS
+            )
+    
+    async def _safe_send(self, websocket: WebSocket, payload: str) -> bool:
+        """
+        Send text to one connection, bounded by SEND_TIMEOUT_SECONDS.
+        
+        Args:
+            websocket: WebSocket connection
+            payload: JSON text to send
+            
+        Returns:
+            True if the send succeeded, False otherwise
+        """
+        try:
+            await asyncio.wait_for(
+                websocket.send_text(payload),
+                timeout=SEND_TIMEOUT_SECONDS
+            )
+            return True
+        except WebSocketDisconnect:
+            return False
+        except asyncio.TimeoutError:
+            logger.warning("Timed out sending to WebSocket connection")
+            return False
+        except Exception:
+            # Connection failed, caller removes it
+            logger.warning("WebSocket send failed", exc_info=True)
+            return False
 
 
 # Global connection manager instance
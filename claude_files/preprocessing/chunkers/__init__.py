@@ -1,5 +1,5 @@
 """Chunkers submodule."""
 
-from .llama_chunker import LlamaChunker, Chunk
+from .llama_chunker import LlamaChunker, Chunk, ChunkBatch, get_chunker
 
-__all__ = ['LlamaChunker', 'Chunk']
+__all__ = ['LlamaChunker', 'Chunk', 'ChunkBatch', 'get_chunker']
@@ -1,9 +1,11 @@
 """Semantic chunking using LlamaIndex."""
 
-from typing import List, Dict
-from dataclasses import dataclass
+from typing import Iterator, List, Dict, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
 from llama_index.core.schema import Document as LlamaDocument
 from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.utils import get_tokenizer
 
 
 @dataclass
@@ -27,6 +29,93 @@ class Chunk:
         }
 
 
+@dataclass
+class ChunkBatch:
+    """
+    Columnar batch of document chunks.
+    
+    Chunk i is described by the i-th entry of every per-chunk column. Fields
+    common to a whole section (or to all tables) are stored once in
+    group_metadata and referenced by index, and the full metadata dict of a
+    chunk is only built when it is needed (see metadata()).
+    
+    A chunk is a table chunk exactly when its node_ids entry is None; text
+    chunks always carry the LlamaIndex node id. Indexing or iterating a
+    batch yields Chunk objects for callers that want one chunk at a time.
+    """
+    
+    texts: List[str] = field(default_factory=list)
+    chunk_indices: List[int] = field(default_factory=list)
+    section_types: List[str] = field(default_factory=list)
+    token_counts: List[int] = field(default_factory=list)
+    # Index within the section for text chunks, table index for tables
+    local_indices: List[int] = field(default_factory=list)
+    # LlamaIndex node id for text chunks, None for tables
+    node_ids: List[Optional[str]] = field(default_factory=list)
+    # Extracted table metadata for tables, None for text chunks
+    table_metadata: List[Optional[Dict]] = field(default_factory=list)
+    # Index into group_metadata for each chunk
+    groups: List[int] = field(default_factory=list)
+    group_metadata: List[Dict] = field(default_factory=list, repr=False)
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def __getitem__(self, i: int) -> Chunk:
+        """Build a Chunk view of chunk i."""
+        return Chunk(
+            text=self.texts[i],
+            chunk_index=self.chunk_indices[i],
+            section_type=self.section_types[i],
+            metadata=self.metadata(i),
+            token_count=self.token_counts[i]
+        )
+    
+    def __iter__(self) -> Iterator[Chunk]:
+        return (self[i] for i in range(len(self)))
+    
+    def is_table(self, i: int) -> bool:
+        """Whether chunk i is a table chunk."""
+        return self.node_ids[i] is None
+    
+    def metadata(self, i: int) -> Dict:
+        """Build the full metadata dict for chunk i."""
+        shared = self.group_metadata[self.groups[i]]
+        if self.is_table(i):
+            return {
+                **shared,
+                'table_index': self.local_indices[i],
+                'table_metadata': self.table_metadata[i]
+            }
+        return {
+            **shared,
+            'node_id': self.node_ids[i],
+            'local_chunk_index': self.local_indices[i]
+        }
+    
+    def extend(self, other: 'ChunkBatch') -> None:
+        """Append all chunks of another batch to this one."""
+        offset = len(self.group_metadata)
+        self.texts.extend(other.texts)
+        self.chunk_indices.extend(other.chunk_indices)
+        self.section_types.extend(other.section_types)
+        self.token_counts.extend(other.token_counts)
+        self.local_indices.extend(other.local_indices)
+        self.node_ids.extend(other.node_ids)
+        self.table_metadata.extend(other.table_metadata)
+        self.groups.extend(group + offset for group in other.groups)
+        self.group_metadata.extend(other.group_metadata)
+
+
+@lru_cache(maxsize=8)
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> SentenceSplitter:
+    """Get a process-wide SentenceSplitter so its tokenizer loads once."""
+    return SentenceSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+
 class LlamaChunker:
     """Semantic chunker using LlamaIndex's SentenceSplitter."""
     
@@ -38,16 +127,15 @@ class LlamaChunker:
             chunk_size: Maximum tokens per chunk
             chunk_overlap: Number of overlapping tokens between chunks
         """
-        self.splitter = SentenceSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
+        self.splitter = _get_splitter(chunk_size, chunk_overlap)
+        # LlamaIndex's global tokenizer, the one SentenceSplitter counts with
+        self._tokenizer = get_tokenizer()
     
     async def chunk_sections(
         self, 
         sections: Dict[str, List[str]], 
         base_metadata: Dict
-    ) -> List[Chunk]:
+    ) -> ChunkBatch:
         """
         Chunk document sections into semantic chunks.
         
@@ -56,10 +144,9 @@ class LlamaChunker:
             base_metadata: Base metadata to attach to all chunks
             
         Returns:
-            List of Chunk objects
+            ChunkBatch of section chunks
         """
-        all_chunks = []
-        chunk_global_index = 0
+        batch = ChunkBatch()
         
         for section_name, section_texts in sections.items():
             if not section_texts:
@@ -68,43 +155,47 @@ class LlamaChunker:
             # Combine section texts
             section_text = '\n\n'.join(section_texts)
             
+            # Shared by the LlamaIndex document and every chunk in the section
+            section_metadata = {
+                **base_metadata,
+                'section_type': section_name
+            }
+            
             # Create LlamaIndex document
             llama_doc = LlamaDocument(
                 text=section_text,
-                metadata={
-                    **base_metadata,
-                    'section_type': section_name
-                }
+                metadata=section_metadata
             )
             
             # Split into nodes
             nodes = self.splitter.get_nodes_from_documents([llama_doc])
             
-            # Convert nodes to Chunk objects
-            for local_idx, node in enumerate(nodes):
-                chunk = Chunk(
-                    text=node.text,
-                    chunk_index=chunk_global_index,
-                    section_type=section_name,
-                    metadata={
-                        **base_metadata,
-                        'section_type': section_name,
-                        'node_id': node.node_id,
-                        'local_chunk_index': local_idx,
-                        'total_chunks_in_section': len(nodes)
-                    },
-                    token_count=self._estimate_tokens(node.text)
-                )
-                all_chunks.append(chunk)
-                chunk_global_index += 1
+            # Per-section fields are merged once and shared by every chunk
+            group = len(batch.group_metadata)
+            batch.group_metadata.append({
+                **section_metadata,
+                'total_chunks_in_section': len(nodes)
+            })
+            
+            # Append nodes column by column
+            start = len(batch)
+            texts = [node.text for node in nodes]
+            batch.texts.extend(texts)
+            batch.chunk_indices.extend(range(start, start + len(nodes)))
+            batch.section_types.extend([section_name] * len(nodes))
+            batch.token_counts.extend(map(self._count_tokens, texts))
+            batch.local_indices.extend(range(len(nodes)))
+            batch.node_ids.extend(node.node_id for node in nodes)
+            batch.table_metadata.extend([None] * len(nodes))
+            batch.groups.extend([group] * len(nodes))
         
-        return all_chunks
+        return batch
     
     async def chunk_tables(
         self,
         tables: List[Dict],
         base_metadata: Dict
-    ) -> List[Chunk]:
+    ) -> ChunkBatch:
         """
         Create chunks for tables.
         
@@ -113,29 +204,40 @@ class LlamaChunker:
             base_metadata: Base metadata to attach to chunks
             
         Returns:
-            List of Chunk objects for tables
+            ChunkBatch of table chunks
         """
-        table_chunks = []
-        
-        for idx, table in enumerate(tables):
-            chunk = Chunk(
-                text=table['text'],
-                chunk_index=idx,
-                section_type='table',
-                metadata={
-                    **base_metadata,
-                    'section_type': 'table',
-                    'table_index': idx,
-                    'table_metadata': table.get('metadata', {})
-                },
-                token_count=self._estimate_tokens(table['text'])
-            )
-            table_chunks.append(chunk)
-        
-        return table_chunks
+        texts = [table['text'] for table in tables]
+        indices = range(len(tables))
+        return ChunkBatch(
+            texts=texts,
+            chunk_indices=list(indices),
+            section_types=['table'] * len(tables),
+            token_counts=list(map(self._count_tokens, texts)),
+            local_indices=list(indices),
+            node_ids=[None] * len(tables),
+            table_metadata=[table.get('metadata', {}) for table in tables],
+            groups=[0] * len(tables),
+            group_metadata=[{
+                **base_metadata,
+                'section_type': 'table'
+            }]
+        )
     
-    def _estimate_tokens(self, text: str) -> int:
-        """Rough token count estimation."""
-        # Approximation: 1 token ≈ 0.75 words
-        words = len(text.split())
-        return int(words * 1.33)
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens with the same tokenizer the splitter sizes chunks by."""
+        return len(self._tokenizer(text))
+
+
+@lru_cache(maxsize=8)
+def get_chunker(chunk_size: int = 512, chunk_overlap: int = 50) -> LlamaChunker:
+    """
+    Get the process-wide LlamaChunker for a chunking configuration.
+    
+    Args:
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Number of overlapping tokens between chunks
+        
+    Returns:
+        Shared LlamaChunker instance
+    """
+    return LlamaChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
@@ -1,5 +1,5 @@
 """Classifiers submodule."""
 
-from .domain_classifier import DomainClassifier
+from .domain_classifier import DomainClassifier, get_classifier
 
-__all__ = ['DomainClassifier']
+__all__ = ['DomainClassifier', 'get_classifier']
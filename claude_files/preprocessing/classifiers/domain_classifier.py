@@ -1,6 +1,14 @@
 """Technical domain classification for patent documents."""
 
-from typing import List, Dict
+from typing import Iterable, List, Dict, Set, Tuple, Union
+from collections import Counter
+from functools import lru_cache
+import re
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional
+    ahocorasick = None
 
 
 class DomainClassifier:
@@ -48,24 +56,113 @@ class DomainClassifier:
         ]
     }
     
-    def classify(self, text: str, min_keywords: int = 2) -> List[str]:
+    # Punctuation stripped from both ends of a word before inspecting it
+    _TERM_PUNCTUATION = '.,;:!?()'
+    
+    # A whitespace run followed by a word whose first non-punctuation
+    # character is A-Z or non-ASCII (the latter still needs an isupper() check)
+    _TERM_PATTERN = re.compile(
+        r'\s+[.,;:!?()]*([A-Z]\S*|[^\x00-\x7f\s]\S*)'
+    )
+    
+    # Runs of lowercase letters and digits
+    _WORD_PATTERN = re.compile(r'[a-z0-9]+')
+    
+    def __init__(self):
+        """Build the keyword matcher on first use; later instances share it."""
+        cls = type(self)
+        if '_keyword_domains' not in cls.__dict__:
+            cls._build_matcher()
+    
+    @classmethod
+    def _build_matcher(cls):
+        """Index TECH_DOMAINS keywords for fast lookup (once per class)."""
+        # keyword -> domains it counts towards
+        keyword_domains: Dict[str, List[str]] = {}
+        for domain, keywords in cls.TECH_DOMAINS.items():
+            for keyword in keywords:
+                keyword_domains.setdefault(keyword, []).append(domain)
+        
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword in keyword_domains:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            cls._automaton = automaton
+        else:
+            cls._automaton = None
+            # Single-word keywords are looked up in the text's vocabulary;
+            # phrases still need a search of the full text
+            cls._word_keywords = [
+                keyword for keyword in keyword_domains
+                if cls._WORD_PATTERN.fullmatch(keyword)
+            ]
+            cls._phrase_keywords = [
+                keyword for keyword in keyword_domains
+                if not cls._WORD_PATTERN.fullmatch(keyword)
+            ]
+        
+        cls._keyword_domains = keyword_domains
+    
+    def _find_keywords(self, parts_lower: List[str]) -> Set[str]:
+        """Return the distinct keywords occurring in any of the text parts."""
+        if self._automaton is not None:
+            # One linear pass over each part
+            return {
+                keyword
+                for part in parts_lower
+                for _, keyword in self._automaton.iter(part)
+            }
+        
+        # An alphanumeric keyword is a substring of the text exactly when it
+        # is a substring of one of its words, so search the (much shorter)
+        # set of distinct words instead of the full text
+        words = set()
+        for part in parts_lower:
+            words.update(self._WORD_PATTERN.findall(part))
+        vocabulary = '\n'.join(words)
+        found = {keyword for keyword in self._word_keywords if keyword in vocabulary}
+        found.update(
+            keyword for keyword in self._phrase_keywords
+            if any(keyword in part for part in parts_lower)
+        )
+        return found
+    
+    def classify(
+        self,
+        text: Union[str, Iterable[str]],
+        min_keywords: int = 2
+    ) -> List[str]:
         """
         Classify technical domain(s) of text.
         
+        Keywords never span a line break, so the text may also be passed as
+        separate parts (e.g. ExtractedContent.text_parts) without joining it.
+        
         Args:
-            text: Text to classify
+            text: Text to classify, as one string or an iterable of parts
             min_keywords: Minimum keyword matches to include a domain
             
         Returns:
             List of identified domains
         """
-        text_lower = text.lower()
-        domain_scores = {}
+        parts = [text] if isinstance(text, str) else text
+        return self._rank_domains(
+            self._find_keywords([part.lower() for part in parts]),
+            min_keywords
+        )
+    
+    def _rank_domains(self, found: Set[str], min_keywords: int) -> List[str]:
+        """Score domains by their distinct keywords found, best first."""
+        counts = Counter()
+        for keyword in found:
+            counts.update(self._keyword_domains[keyword])
         
-        for domain, keywords in self.TECH_DOMAINS.items():
-            matches = sum(1 for keyword in keywords if keyword in text_lower)
-            if matches >= min_keywords:
-                domain_scores[domain] = matches
+        # Iterate in TECH_DOMAINS order so ties keep their original ranking
+        domain_scores = {}
+        for domain in self.TECH_DOMAINS:
+            if counts[domain] >= min_keywords:
+                domain_scores[domain] = counts[domain]
         
         # Sort by score and return domains
         sorted_domains = sorted(
@@ -78,35 +175,92 @@ class DomainClassifier:
         domains = [domain for domain, score in sorted_domains]
         return domains if domains else ['general']
     
-    def extract_technical_terms(self, text: str, max_terms: int = 20) -> List[str]:
+    def extract_technical_terms(
+        self,
+        text: Union[str, Iterable[str]],
+        max_terms: int = 20
+    ) -> List[str]:
         """
         Extract likely technical terms from text.
         
         Args:
-            text: Text to analyze
+            text: Text to analyze, as one string or an iterable of parts
+                that would be joined by blank lines
             max_terms: Maximum number of terms to extract
             
         Returns:
             List of technical terms
         """
+        parts = [text] if isinstance(text, str) else text
+        return self._collect_terms(parts, max_terms)
+    
+    def analyze(
+        self,
+        text: Union[str, Iterable[str]],
+        min_keywords: int = 2,
+        max_terms: int = 20
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Classify text and extract its technical terms in one call.
+        
+        Lowercasing and keyword matching happen once per part, and the term
+        scan stops as soon as max_terms terms are found, so the document
+        is never joined into a single string.
+        
+        Args:
+            text: Text to analyze, as one string or an iterable of parts
+                that would be joined by blank lines
+            min_keywords: Minimum keyword matches to include a domain
+            max_terms: Maximum number of terms to extract
+            
+        Returns:
+            Tuple of (domains, technical terms), as classify() and
+            extract_technical_terms() would return them
+        """
+        parts = [text] if isinstance(text, str) else list(text)
+        domains = self._rank_domains(
+            self._find_keywords([part.lower() for part in parts]),
+            min_keywords
+        )
+        return domains, self._collect_terms(parts, max_terms)
+    
+    def _collect_terms(self, parts: Iterable[str], max_terms: int) -> List[str]:
+        """Find technical terms in the parts as if joined by blank lines."""
         # Simple heuristic: capitalized words (potential acronyms/proper nouns)
-        # and multi-word technical phrases
-        words = text.split()
-        technical_terms = []
+        # not at the start of a sentence, found in a single regex scan
+        technical_terms = {}  # Ordered set of unique terms
+        # Last non-whitespace character before the current part, if any
+        previous = None
         
-        for i, word in enumerate(words):
-            # Remove punctuation for analysis
-            clean_word = word.strip('.,;:!?()')
+        for index, part in enumerate(parts):
+            # Prefix the separator so matches at the part boundary behave
+            # as they would in the joined text
+            scan = part if index == 0 else '\n\n' + part
             
-            # Capitalized words (not at sentence start)
-            if len(clean_word) > 2 and clean_word[0].isupper() and i > 0:
-                if words[i-1].endswith('.'):
-                    continue  # Likely sentence start
-                technical_terms.append(clean_word)
-        
-        # Return unique terms, limited to max_terms
-        unique_terms = list(dict.fromkeys(technical_terms))  # Preserve order
-        return unique_terms[:max_terms]
+            for match in self._TERM_PATTERN.finditer(scan):
+                # Skip the first word and likely sentence starts. A match at
+                # 0 continues a whitespace run from the previous parts
+                start = match.start()
+                if start == 0:
+                    if previous is None or previous == '.':
+                        continue
+                elif scan[start - 1] == '.':
+                    continue
+                
+                # Remove trailing punctuation (leading is skipped by the pattern)
+                clean_word = match.group(1).rstrip(self._TERM_PUNCTUATION)
+                if len(clean_word) > 2 and clean_word[0].isupper():
+                    technical_terms[clean_word] = None
+                    
+                    # Stop scanning once enough unique terms are found
+                    if len(technical_terms) == max_terms:
+                        return list(technical_terms)
+            
+            stripped = part.rstrip()
+            if stripped:
+                previous = stripped[-1]
+        
+        return list(technical_terms)[:max_terms]
     
     def get_cpc_hints(self, domains: List[str]) -> List[str]:
         """
@@ -136,3 +290,9 @@ class DomainClassifier:
                 cpc_hints.extend(cpc_mapping[domain])
         
         return list(set(cpc_hints))  # Remove duplicates
+
+
+@lru_cache(maxsize=None)
+def get_classifier() -> DomainClassifier:
+    """Get the process-wide DomainClassifier."""
+    return DomainClassifier()
@@ -1,5 +1,5 @@
 """Embedders submodule."""
 
-from .patent_embedder import PatentEmbedder
+from .patent_embedder import PatentEmbedder, get_embedder
 
-__all__ = ['PatentEmbedder']
+__all__ = ['PatentEmbedder', 'get_embedder']
@@ -0,0 +1,96 @@
+"""ONNX Runtime embedding backend for CPU inference."""
+
+from typing import List
+from pathlib import Path
+import numpy as np
+import onnxruntime
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+from .patent_embedder import PatentEmbedder
+
+
+# Where exported (and quantized) models are kept between runs
+DEFAULT_EXPORT_DIR = Path.home() / ".cache" / "patent_embedder_onnx"
+
+
+class OnnxPatentEmbedder(PatentEmbedder):
+    """PatentEmbedder running an exported ONNX model, optionally int8-quantized."""
+    
+    def __init__(
+        self,
+        model_name: str = "AI-Growth-Lab/PatentSBERTa",
+        quantize: bool = True,
+        export_dir: Path = DEFAULT_EXPORT_DIR,
+        max_length: int = 512
+    ):
+        """
+        Initialize embedder.
+        
+        The model is exported to ONNX on first use and reused afterwards.
+        
+        Args:
+            model_name: HuggingFace model name for embeddings
+            quantize: Apply dynamic int8 quantization to the exported model
+            export_dir: Directory holding exported models
+            max_length: Maximum tokens per text
+        """
+        self.quantize = quantize
+        self.export_dir = Path(export_dir) / model_name.replace('/', '--')
+        self.max_length = max_length
+        super().__init__(model_name=model_name, device="cpu", half_precision=False)
+    
+    def _load_model(self, model_name: str, device: str, half_precision: bool):
+        """Export (once) and load the ONNX model and its tokenizer."""
+        model_file = self.export_dir / ("model_quantized.onnx" if self.quantize else "model.onnx")
+        
+        if not model_file.exists():
+            model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            model.save_pretrained(self.export_dir)
+            
+            if self.quantize:
+                quantizer = ORTQuantizer.from_pretrained(model)
+                config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+                quantizer.quantize(save_dir=self.export_dir, quantization_config=config)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.session = onnxruntime.InferenceSession(
+            str(model_file),
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+    
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed one batch with a single forward pass."""
+        return self._forward(texts)
+    
+    def _embed_text(self, text: str) -> List[float]:
+        """Embed one text (runs in thread pool)."""
+        return self._forward([text])[0].tolist()
+    
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        """Run one forward pass and mean-pool into normalized embeddings."""
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        inputs = {name: value for name, value in encoded.items() if name in self._input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+        
+        # Mean pooling weighted by the attention mask
+        mask = encoded["attention_mask"][..., np.newaxis].astype(token_embeddings.dtype)
+        summed = (token_embeddings * mask).sum(axis=1)
+        embeddings = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        
+        return embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+    
+    def _get_embedding_dimension(self) -> int:
+        """Get the dimension of embeddings from the model's output shape."""
+        dimension = self.session.get_outputs()[0].shape[-1]
+        if isinstance(dimension, int):
+            return dimension
+        return len(self._embed_text("test"))
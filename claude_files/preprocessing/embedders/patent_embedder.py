@@ -1,28 +1,82 @@
 """Embedding generation for patent and technical documents."""
 
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import asyncio
+import hashlib
+import numpy as np
+import torch
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
 
+# Embedding dimension per model name, shared by all instances in the process
+_DIMENSION_CACHE: Dict[str, int] = {}
+
+# How long the consumer waits for more concurrent requests before embedding
+BATCH_WAIT_SECONDS = 0.005
+
+# Stop waiting for more requests once this many texts are pending
+MAX_COALESCED_TEXTS = 256
+
+
 class PatentEmbedder:
     """Generates embeddings optimized for patent text."""
     
-    def __init__(self, model_name: str = "AI-Growth-Lab/PatentSBERTa", device: str = "cpu"):
+    def __init__(
+        self,
+        model_name: str = "AI-Growth-Lab/PatentSBERTa",
+        device: Optional[str] = None,
+        half_precision: bool = True,
+        cache_size: int = 10000
+    ):
         """
         Initialize embedder.
         
         Args:
             model_name: HuggingFace model name for embeddings
-            device: 'cpu' or 'cuda' for GPU acceleration
+            device: 'cpu' or 'cuda'; None picks 'cuda' when available
+            half_precision: Run the model in FP16 when on GPU
+            cache_size: Maximum number of embeddings kept in the LRU cache
         """
+        if device is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = device
+        self.model_name = model_name
+        
+        self._load_model(model_name, device, half_precision)
+        self.embedding_dim = self._get_embedding_dimension()
+        
+        # Text digest -> embedding, most recently used last
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_size = cache_size
+        
+        # All model calls run on one dedicated thread
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="patent-embedder"
+        )
+        # Per event loop: queue of pending (texts, batch_size, future)
+        # requests and the _consume task draining it. The embedder is shared
+        # process-wide, and a queue or future only works on its own loop
+        self._consumers: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Queue, asyncio.Task]] = {}
+    
+    def _load_model(self, model_name: str, device: str, half_precision: bool):
+        """Load the HuggingFace model (overridden by other backends)."""
         self.embed_model = HuggingFaceEmbedding(
             model_name=model_name,
             device=device
         )
-        self.embedding_dim = self._get_embedding_dimension()
+        
+        # Inference only: disable dropout
+        self.embed_model._model.eval()
+        
+        # FP16 halves memory traffic per forward pass on GPU; CPU stays FP32
+        if half_precision and device.startswith("cuda"):
+            self.embed_model._model.half()
     
-    async def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+    async def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
         
@@ -31,33 +85,145 @@ class PatentEmbedder:
             batch_size: Batch size for processing
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimension), one row per text
         """
+        results = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
         if not texts:
-            return []
-        
-        # Run CPU-intensive embedding generation in thread pool
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None,
-            self._generate_batch,
-            texts,
-            batch_size
-        )
+            return results
+        
+        keys = [self._cache_key(text) for text in texts]
+        
+        # Serve repeated texts from the cache; embed each unseen text once
+        misses: Dict[bytes, List[int]] = {}
+        for i, key in enumerate(keys):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                results[i] = self._cache[key]
+            else:
+                misses.setdefault(key, []).append(i)
+        
+        if misses:
+            miss_texts = [texts[indices[0]] for indices in misses.values()]
+            
+            # Requests from concurrent callers are merged into one model pass
+            loop, queue = self._ensure_consumer()
+            future = loop.create_future()
+            queue.put_nowait((miss_texts, batch_size, future))
+            embeddings = await future
+            
+            for (key, indices), embedding in zip(misses.items(), embeddings):
+                # Copy so a cached row does not keep the whole batch alive
+                self._cache_put(key, embedding.copy())
+                results[indices] = embedding
         
-        return embeddings
+        return results
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Content hash used as the embedding cache key."""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def _cache_put(self, key: bytes, embedding: np.ndarray):
+        """Store an embedding, evicting the least recently used if full."""
+        self._cache[key] = embedding
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
     
-    def _generate_batch(self, texts: List[str], batch_size: int) -> List[List[float]]:
-        """Generate embeddings in batches (runs in thread pool)."""
-        all_embeddings = []
+    def _ensure_consumer(self) -> Tuple[asyncio.AbstractEventLoop, asyncio.Queue]:
+        """
+        Get the running loop's request queue, starting its consumer if needed.
+        
+        Each loop gets its own queue and consumer, so requests made on one
+        loop never wait on a consumer running on another. Entries for
+        closed loops are dropped.
+        """
+        loop = asyncio.get_running_loop()
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_embeddings = self.embed_model.get_text_embedding_batch(batch)
-            all_embeddings.extend(batch_embeddings)
+        for stale in [other for other in self._consumers if other.is_closed()]:
+            del self._consumers[stale]
+        
+        entry = self._consumers.get(loop)
+        if entry is None or entry[1].done():
+            queue: asyncio.Queue = asyncio.Queue()
+            entry = (queue, loop.create_task(self._consume(loop, queue)))
+            self._consumers[loop] = entry
+        
+        return loop, entry[0]
+    
+    async def _consume(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        """Embed everything queued so far in one batch, then repeat."""
+        while True:
+            requests: List[Tuple[List[str], int, asyncio.Future]] = [await queue.get()]
+            pending_texts = len(requests[0][0])
+            
+            # Give concurrent callers a short window to join this batch. The
+            # queue is drained with get_nowait after sleeping rather than
+            # with wait_for(get()), which before Python 3.12 can drop an
+            # item dequeued just as the timeout fires
+            deadline = loop.time() + BATCH_WAIT_SECONDS
+            while pending_texts < MAX_COALESCED_TEXTS:
+                try:
+                    request = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    await asyncio.sleep(timeout)
+                    continue
+                requests.append(request)
+                pending_texts += len(request[0])
+            
+            texts = [text for request_texts, _, _ in requests for text in request_texts]
+            batch_size = min(request_batch_size for _, request_batch_size, _ in requests)
+            
+            try:
+                embeddings = await loop.run_in_executor(
+                    self._executor,
+                    self._generate_batch,
+                    texts,
+                    batch_size
+                )
+            except Exception as e:
+                for _, _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            # Hand each caller back its own slice
+            offset = 0
+            for request_texts, _, future in requests:
+                end = offset + len(request_texts)
+                if not future.done():
+                    future.set_result(embeddings[offset:end])
+                offset = end
+    
+    def _generate_batch(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """
+        Generate embeddings in batches (runs in thread pool).
+        
+        Texts are batched in order of length so each batch pads to a
+        similar length; each batch is written straight into its rows of
+        one preallocated float32 array, in input order.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        all_embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        
+        for i in range(0, len(order), batch_size):
+            batch_indices = order[i:i + batch_size]
+            batch = [texts[j] for j in batch_indices]
+            all_embeddings[batch_indices] = np.asarray(
+                self._embed_batch(batch),
+                dtype=np.float32
+            )
         
         return all_embeddings
     
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch with a single model call."""
+        with torch.inference_mode():
+            return self.embed_model.get_text_embedding_batch(texts)
+    
     async def generate_single_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text.
@@ -68,21 +234,75 @@ class PatentEmbedder:
         Returns:
             Embedding vector
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         embedding = await loop.run_in_executor(
-            None,
-            self.embed_model.get_text_embedding,
+            self._executor,
+            self._embed_text,
             text
         )
         return embedding
     
+    def _embed_text(self, text: str) -> List[float]:
+        """Embed one text (runs in thread pool)."""
+        with torch.inference_mode():
+            return self.embed_model.get_text_embedding(text)
+    
     def _get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings from this model."""
-        # Generate a test embedding to determine dimension
-        test_embedding = self.embed_model.get_text_embedding("test")
-        return len(test_embedding)
+        model_name = self.model_name
+        if model_name in _DIMENSION_CACHE:
+            return _DIMENSION_CACHE[model_name]
+        
+        # Read it from the model itself rather than running a forward pass
+        model = getattr(self.embed_model, '_model', None)
+        if hasattr(model, 'get_sentence_embedding_dimension'):
+            dimension = model.get_sentence_embedding_dimension()
+        elif hasattr(getattr(model, 'config', None), 'hidden_size'):
+            dimension = model.config.hidden_size
+        else:
+            dimension = None
+        
+        if not dimension:
+            # Generate a test embedding to determine dimension
+            dimension = len(self.embed_model.get_text_embedding("test"))
+        
+        _DIMENSION_CACHE[model_name] = dimension
+        return dimension
     
     @property
     def dimension(self) -> int:
         """Get embedding dimension."""
         return self.embedding_dim
+
+
+@lru_cache(maxsize=None)
+def get_embedder(
+    model_name: str = "AI-Growth-Lab/PatentSBERTa",
+    device: Optional[str] = None,
+    half_precision: bool = True,
+    backend: str = "huggingface"
+) -> PatentEmbedder:
+    """
+    Get the process-wide PatentEmbedder for a model configuration.
+    
+    The model is loaded on first use and shared by every caller afterwards,
+    so pipelines created per request do not reload it.
+    
+    Args:
+        model_name: HuggingFace model name for embeddings
+        device: 'cpu' or 'cuda'; None picks 'cuda' when available
+        half_precision: Run the model in FP16 when on GPU
+        backend: 'huggingface', or 'onnx' for the ONNX Runtime CPU backend
+        
+    Returns:
+        Shared PatentEmbedder instance
+    """
+    if backend == "onnx":
+        from .onnx_embedder import OnnxPatentEmbedder
+        return OnnxPatentEmbedder(model_name=model_name)
+    
+    return PatentEmbedder(
+        model_name=model_name,
+        device=device,
+        half_precision=half_precision
+    )
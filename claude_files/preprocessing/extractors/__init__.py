@@ -1,6 +1,6 @@
 """Extractors submodule."""
 
 from .base import BaseExtractor, ExtractedContent
-from .unstructured_extractor import UnstructuredExtractor
+from .unstructured_extractor import UnstructuredExtractor, get_extractor
 
-__all__ = ['BaseExtractor', 'ExtractedContent', 'UnstructuredExtractor']
+__all__ = ['BaseExtractor', 'ExtractedContent', 'UnstructuredExtractor', 'get_extractor']
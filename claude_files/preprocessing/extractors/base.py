@@ -1,20 +1,60 @@
 """Base extractor interface for document content extraction."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
+from functools import cached_property
 
 
 @dataclass
 class ExtractedContent:
-    """Structured container for extracted document content."""
+    """
+    Structured container for extracted document content.
+    
+    The document text is kept as the list of element texts it was extracted
+    from; full_text joins them only on first access. Passing full_text
+    instead of text_parts, by keyword or in its old position, still works
+    and stores the text as a single part.
+    """
     
     sections: Dict[str, List[str]]
     tables: List[Dict]
     metadata: Dict
-    full_text: str
+    text_parts: List[str]
     has_tables: bool = False
     
+    def __init__(
+        self,
+        sections: Dict[str, List[str]],
+        tables: List[Dict],
+        metadata: Dict,
+        text_parts: Optional[List[str]] = None,
+        has_tables: bool = False,
+        *,
+        full_text: Optional[str] = None
+    ):
+        if text_parts is not None and full_text is not None:
+            raise TypeError("pass either text_parts or full_text, not both")
+        if isinstance(text_parts, str):
+            # Positional full_text from before text_parts existed
+            full_text, text_parts = text_parts, None
+        
+        self.sections = sections
+        self.tables = tables
+        self.metadata = metadata
+        self.has_tables = has_tables
+        if full_text is None:
+            self.text_parts = text_parts if text_parts is not None else []
+        else:
+            self.text_parts = [full_text]
+            # Seed the cached property so it is not rebuilt from the parts
+            self.__dict__['full_text'] = full_text
+    
+    @cached_property
+    def full_text(self) -> str:
+        """All element texts joined by blank lines."""
+        return '\n\n'.join(self.text_parts)
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary representation."""
         return {
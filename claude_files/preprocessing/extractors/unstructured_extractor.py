@@ -1,6 +1,10 @@
 """Document content extractor using Unstructured.io library."""
 
 import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List
 from unstructured.partition.auto import partition
@@ -8,6 +12,20 @@ from unstructured.partition.auto import partition
 from .base import BaseExtractor, ExtractedContent
 
 
+# Threads reserved for CPU-bound parsing, so extraction never queues behind
+# unrelated work on the event loop's default executor
+_CPU_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="extract"
+)
+
+# Maps spaces to underscores when slugifying section titles
+_SLUG = str.maketrans(' ', '_')
+
+# Longest section key, numeric suffix included (section_type is VARCHAR(50))
+MAX_SECTION_NAME_LENGTH = 50
+
+
 class UnstructuredExtractor(BaseExtractor):
     """Extractor using Unstructured.io for document parsing."""
     
@@ -23,10 +41,10 @@ class UnstructuredExtractor(BaseExtractor):
         Returns:
             ExtractedContent with organized sections and metadata
         """
-        # Run CPU-intensive partition in thread pool
+        # Run CPU-intensive partition in the dedicated thread pool
         loop = asyncio.get_event_loop()
         elements = await loop.run_in_executor(
-            None, 
+            _CPU_POOL,
             partition,
             file_path
         )
@@ -38,7 +56,7 @@ class UnstructuredExtractor(BaseExtractor):
             sections=organized['sections'],
             tables=organized['tables'],
             metadata=organized['metadata'],
-            full_text=organized['full_text'],
+            text_parts=organized['text_parts'],
             has_tables=len(organized['tables']) > 0
         )
     
@@ -49,7 +67,8 @@ class UnstructuredExtractor(BaseExtractor):
     
     def _organize_elements(self, elements) -> Dict:
         """Organize extracted elements into structured format."""
-        sections = {'introduction': []}
+        sections = defaultdict(list)
+        sections['introduction'] = []
         tables = []
         all_text = []
         current_section = 'introduction'
@@ -59,15 +78,12 @@ class UnstructuredExtractor(BaseExtractor):
             
             if element_type == 'Title':
                 # New section detected
-                section_name = element.text.lower().replace(' ', '_')[:50]
-                current_section = section_name
-                sections[current_section] = []
+                section_name = element.text.lower().translate(_SLUG)
+                current_section = self._start_section(sections, section_name)
                 all_text.append(element.text)
                 
             elif element_type == 'NarrativeText':
                 # Add text to current section
-                if current_section not in sections:
-                    sections[current_section] = []
                 sections[current_section].append(element.text)
                 all_text.append(element.text)
                 
@@ -81,21 +97,45 @@ class UnstructuredExtractor(BaseExtractor):
                 
             elif element_type == 'ListItem':
                 # Add lists to current section
-                if current_section not in sections:
-                    sections[current_section] = []
                 sections[current_section].append(element.text)
                 all_text.append(element.text)
         
         return {
-            'sections': sections,
+            'sections': dict(sections),
             'tables': tables,
             'metadata': {
                 'total_sections': len(sections),
                 'total_tables': len(tables)
             },
-            'full_text': '\n\n'.join(all_text)
+            'text_parts': all_text
         }
     
+    @staticmethod
+    def _start_section(sections: Dict[str, List[str]], name: str) -> str:
+        """
+        Add an empty section and return its key.
+        
+        A name already used by a section with content gets a numeric
+        suffix, so a repeated heading never discards earlier text. Keys are
+        cut to MAX_SECTION_NAME_LENGTH, shortening the name to make room
+        for the suffix.
+        
+        Args:
+            sections: Sections collected so far
+            name: Slugified section name
+            
+        Returns:
+            Key of the new section
+        """
+        key = name[:MAX_SECTION_NAME_LENGTH]
+        suffix = 2
+        while sections.get(key):
+            tail = f"_{suffix}"
+            key = name[:MAX_SECTION_NAME_LENGTH - len(tail)] + tail
+            suffix += 1
+        sections[key] = []
+        return key
+    
     def _extract_element_metadata(self, element) -> Dict:
         """Extract metadata from an element."""
         if hasattr(element, 'metadata') and element.metadata:
@@ -103,3 +143,9 @@ class UnstructuredExtractor(BaseExtractor):
                 return element.metadata.to_dict()
             return dict(element.metadata)
         return {}
+
+
+@lru_cache(maxsize=None)
+def get_extractor() -> UnstructuredExtractor:
+    """Get the process-wide UnstructuredExtractor."""
+    return UnstructuredExtractor()
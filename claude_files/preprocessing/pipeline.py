@@ -2,13 +2,29 @@
 
 from typing import Callable, Optional, Dict
 from datetime import datetime
+import asyncio
+import hashlib
+from sqlalchemy import JSON, cast, func, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
 from enum import Enum
 
-from .extractors.unstructured_extractor import UnstructuredExtractor
-from .chunkers.llama_chunker import LlamaChunker
-from .embedders.patent_embedder import PatentEmbedder
-from .classifiers.domain_classifier import DomainClassifier
+from .extractors.base import BaseExtractor
+from .extractors.unstructured_extractor import get_extractor
+from .chunkers.llama_chunker import ChunkBatch, LlamaChunker, get_chunker
+from .embedders.patent_embedder import PatentEmbedder, get_embedder
+from .classifiers.domain_classifier import DomainClassifier, get_classifier
+
+
+# Chunks embedded per micro-batch in the embedding stage
+EMBED_BATCH_SIZE = 32
+
+# Embedded batches allowed to wait for the database writer
+CHANNEL_BUFFER_SIZE = 16
+
+# Extraction taking longer than this fails the document; the parse thread
+# itself runs on until it returns (see _extract)
+EXTRACT_TIMEOUT_SECONDS = 600
 
 
 class ProcessingStage(Enum):
@@ -29,21 +45,32 @@ class DocumentPreprocessingPipeline:
         self, 
         db: Session,
         embedding_model: str = "AI-Growth-Lab/PatentSBERTa",
-        device: str = "cpu"
+        device: Optional[str] = None,
+        extractor: Optional[BaseExtractor] = None,
+        chunker: Optional[LlamaChunker] = None,
+        embedder: Optional[PatentEmbedder] = None,
+        classifier: Optional[DomainClassifier] = None
     ):
         """
         Initialize pipeline with required components.
         
+        Components not passed in are the process-wide shared instances, so
+        creating a pipeline per request never reloads models or tokenizers.
+        
         Args:
             db: SQLAlchemy database session
             embedding_model: Model name for embeddings
-            device: 'cpu' or 'cuda'
+            device: 'cpu' or 'cuda'; None picks 'cuda' when available
+            extractor: Optional extractor to use instead of the shared one
+            chunker: Optional chunker to use instead of the shared one
+            embedder: Optional embedder to use instead of the shared one
+            classifier: Optional classifier to use instead of the shared one
         """
         self.db = db
-        self.extractor = UnstructuredExtractor()
-        self.chunker = LlamaChunker(chunk_size=512, chunk_overlap=50)
-        self.embedder = PatentEmbedder(model_name=embedding_model, device=device)
-        self.classifier = DomainClassifier()
+        self.extractor = extractor or get_extractor()
+        self.chunker = chunker or get_chunker(chunk_size=512, chunk_overlap=50)
+        self.embedder = embedder or get_embedder(model_name=embedding_model, device=device)
+        self.classifier = classifier or get_classifier()
     
     async def process_document(
         self,
@@ -70,26 +97,16 @@ class DocumentPreprocessingPipeline:
             # Import here to avoid circular imports
             from src.models.document import Document, DocumentChunk
             
-            # Get document from database
-            document = self.db.query(Document).filter(
-                Document.id == document_id
-            ).first()
-            
-            if not document:
-                raise ValueError(f"Document {document_id} not found")
-            
-            # Update status to processing
-            document.processing_status = "processing"
-            self.db.commit()
+            # Progress is reported through the callback; the document row is
+            # only written once, by the UPDATE at the end
             
             # Stage 1: Extract content
             await self._update_progress(progress_callback, ProcessingStage.EXTRACTING, 20)
-            extracted = await self.extractor.extract(file_path)
+            extracted = await self._extract(file_path)
             
             # Stage 2: Classify domain
             await self._update_progress(progress_callback, ProcessingStage.CLASSIFYING, 35)
-            domains = self.classifier.classify(extracted.full_text)
-            technical_terms = self.classifier.extract_technical_terms(extracted.full_text)
+            domains, technical_terms = self.classifier.analyze(extracted.text_parts)
             cpc_hints = self.classifier.get_cpc_hints(domains)
             
             # Stage 3: Create chunks
@@ -114,41 +131,44 @@ class DocumentPreprocessingPipeline:
                 base_metadata
             )
             
-            all_chunks = section_chunks + table_chunks
+            all_chunks = section_chunks
+            all_chunks.extend(table_chunks)
             
-            # Stage 4: Generate embeddings
+            # Stage 4: Generate embeddings, writing each finished batch to
+            # the database while the next one is being embedded
             await self._update_progress(progress_callback, ProcessingStage.EMBEDDING, 70)
-            chunk_texts = [chunk.text for chunk in all_chunks]
-            embeddings = await self.embedder.generate_embeddings(chunk_texts)
+            await self._embed_and_store(document_id, all_chunks, DocumentChunk)
             
             # Stage 5: Store in database
             await self._update_progress(progress_callback, ProcessingStage.STORING, 85)
-            for chunk, embedding in zip(all_chunks, embeddings):
-                db_chunk = DocumentChunk(
-                    document_id=document_id,
-                    chunk_text=chunk.text,
-                    chunk_index=chunk.chunk_index,
-                    embedding=embedding,
-                    section_type=chunk.section_type,
-                    token_count=chunk.token_count,
-                    importance_score=1.0,
-                    metadata=chunk.metadata
-                )
-                self.db.add(db_chunk)
             
-            # Update document metadata
-            document.processing_status = "completed"
-            document.processed_at = datetime.utcnow()
-            document.metadata = {
-                **document.metadata,
+            # Update document status and merge in the new metadata with one
+            # UPDATE, without loading the row
+            processing_metadata = {
                 'total_chunks': len(all_chunks),
                 'technical_domains': domains,
                 'technical_terms': technical_terms,
                 'cpc_hints': cpc_hints,
                 'has_tables': extracted.has_tables,
-                'embedding_model': self.embedder.embed_model.model_name,
+                'embedding_model': self.embedder.model_name,
                 'embedding_dimension': self.embedder.dimension
             }
+            result = self.db.execute(
+                update(Document)
+                .where(Document.id == document_id)
+                .values(
+                    processing_status="completed",
+                    processed_at=datetime.utcnow(),
+                    metadata=cast(
+                        func.coalesce(cast(Document.metadata, JSONB), cast({}, JSONB))
+                        .op('||')(cast(processing_metadata, JSONB)),
+                        JSON
+                    )
+                )
+            )
+            
+            if result.rowcount == 0:
+                raise ValueError(f"Document {document_id} not found")
             
             self.db.commit()
             
@@ -164,19 +184,135 @@ class DocumentPreprocessingPipeline:
             }
             
         except Exception as e:
-            # Update document status to failed
-            document = self.db.query(Document).filter(
-                Document.id == document_id
-            ).first()
+            # Discard any chunks flushed before the failure
+            self.db.rollback()
             
-            if document:
-                document.processing_status = "failed"
-                document.processing_error = str(e)
-                self.db.commit()
+            # Update document status to failed
+            self.db.execute(
+                update(Document)
+                .where(Document.id == document_id)
+                .values(processing_status="failed", processing_error=str(e))
+            )
+            self.db.commit()
             
             await self._update_progress(progress_callback, ProcessingStage.FAILED, 0, str(e))
             raise e
     
+    async def _extract(self, file_path: str):
+        """
+        Run the extractor with a timeout.
+        
+        Concurrency is bounded by the extractor's own thread pool. A parse
+        that times out fails its document, but threads cannot be cancelled:
+        the parse keeps running and keeps its pool thread until it returns,
+        so parses that never return eventually use up the pool.
+        """
+        return await asyncio.wait_for(
+            self.extractor.extract(file_path),
+            EXTRACT_TIMEOUT_SECONDS
+        )
+    
+    def _content_hash(self, text: str) -> bytes:
+        """
+        Key identifying a chunk's embedding: its text under this model.
+        
+        The model name is part of the hash so embeddings are only reused
+        when they came from the same model.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.embedder.model_name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8'))
+        return digest.digest()
+    
+    async def _embed_and_store(self, document_id: str, chunks: ChunkBatch, chunk_model):
+        """
+        Embed chunks in micro-batches and bulk-insert each batch.
+        
+        Chunks whose content hash is already stored reuse that embedding
+        and are inserted up front; only the rest go through the model.
+        Embedding runs on the embedder's worker thread and inserts run in a
+        worker thread too, so the event loop stays free to submit batch N+1
+        while batch N is being written. The session is only ever used by
+        one thread at a time. The bounded queue keeps at most
+        CHANNEL_BUFFER_SIZE embedded batches waiting to be written.
+        
+        Args:
+            document_id: UUID of document in database
+            chunks: Chunks to embed and store
+            chunk_model: DocumentChunk ORM model
+        """
+        hashes = [self._content_hash(text) for text in chunks.texts]
+        
+        def find_existing():
+            return dict(
+                self.db.query(chunk_model.content_hash, chunk_model.embedding)
+                .filter(
+                    chunk_model.content_hash.in_(set(hashes)),
+                    chunk_model.embedding.isnot(None)
+                )
+            )
+        
+        # One query for every embedding this document could reuse, off the
+        # loop like the inserts below
+        existing = await asyncio.to_thread(find_existing) if hashes else {}
+        
+        def build_rows(indices, embeddings):
+            # Chunk metadata dicts are only built here
+            return [
+                chunk_model(
+                    document_id=document_id,
+                    chunk_text=chunks.texts[i],
+                    chunk_index=chunks.chunk_indices[i],
+                    embedding=embedding,
+                    content_hash=hashes[i],
+                    section_type=chunks.section_types[i],
+                    token_count=chunks.token_counts[i],
+                    importance_score=1.0,
+                    metadata=chunks.metadata(i)
+                )
+                for i, embedding in zip(indices, embeddings)
+            ]
+        
+        reused = [i for i, key in enumerate(hashes) if key in existing]
+        missing = [i for i, key in enumerate(hashes) if key not in existing]
+        
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CHANNEL_BUFFER_SIZE)
+        
+        async def produce():
+            try:
+                for start in range(0, len(missing), EMBED_BATCH_SIZE):
+                    indices = missing[start:start + EMBED_BATCH_SIZE]
+                    embeddings = await self.embedder.generate_embeddings(
+                        [chunks.texts[i] for i in indices]
+                    )
+                    await queue.put((indices, embeddings))
+            except Exception as e:
+                # Hand the error to the writer so it is raised there
+                await queue.put(e)
+                return
+            await queue.put(None)
+        
+        producer = asyncio.create_task(produce())
+        try:
+            # Written while the first batch is being embedded
+            if reused:
+                await asyncio.to_thread(
+                    self.db.bulk_save_objects,
+                    build_rows(reused, [existing[hashes[i]] for i in reused])
+                )
+            
+            while (item := await queue.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                
+                # One executemany INSERT per batch, no per-object unit of work,
+                # off the loop so the producer can submit the next batch
+                await asyncio.to_thread(self.db.bulk_save_objects, build_rows(*item))
+        finally:
+            # Stop embedding if writing failed
+            producer.cancel()
+    
     async def _update_progress(
         self,
         callback: Optional[Callable],
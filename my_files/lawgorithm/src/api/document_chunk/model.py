@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, JSON, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.orm import relationship
@@ -15,6 +15,8 @@ class DocumentChunk(Base):
     chunk_index = Column(Integer, nullable=False)
     
     embedding = Column(Vector(768))  # Adjust dimension as needed
+    # blake2b of (embedding model, chunk_text); lets identical chunks reuse an embedding
+    content_hash = Column(LargeBinary(16), index=True)
     
     section_type = Column(String(50))
     page_number = Column(Integer)
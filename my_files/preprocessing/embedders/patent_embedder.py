@@ -1,5 +1,6 @@
 from typing import List
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
 
@@ -9,6 +10,14 @@ class PatentEmbedder:
     ):
 
         self.embedder = HuggingFaceEmbedding(model_name=model_name, device=device)
+        # Read once from the underlying SentenceTransformer; no forward pass
+        self.embedding_dim = self.embedder._model.get_sentence_embedding_dimension()
+
+        # Model calls get their own thread instead of the loop's default
+        # executor, so they never queue behind unrelated blocking work
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="patent-embedder"
+        )
 
     async def generate_embeddings(
         self, text: List[str], batch_size: int = 32
@@ -19,7 +28,7 @@ class PatentEmbedder:
 
         loop = asyncio.get_event_loop()
         embeddings = await loop.run_in_executor(
-            None, self._generate_batch, text, batch_size
+            self._executor, self._generate_batch, text, batch_size
         )
 
         return embeddings
@@ -41,15 +50,11 @@ class PatentEmbedder:
 
         loop = asyncio.get_event_loop()
         embeddings = await loop.run_in_executor(
-            None, self.embedder.get_text_embedding, text
+            self._executor, self.embedder.get_text_embedding, text
         )
 
         return embeddings
 
-    def _get_embedding_dimension(self) -> int:
-        test_embedding = self.embedder.get_text_embedding("test")
-        return len(test_embedding)
-
     @property
     def dimension(self) -> int:
         return self.embedding_dim
@@ -1,4 +1,11 @@
 import asyncio
+import multiprocessing
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import zip_longest
 from pathlib import Path
 from typing import Dict, List
 from unstructured.partition.auto import partition
@@ -6,24 +13,90 @@ import pdfplumber
 
 from .base import BaseExtractor, ExtractedContent
 
+# Threads reserved for CPU-bound parsing, so extraction never queues behind
+# unrelated work on the event loop's default executor
+_CPU_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="extract"
+)
+
+# Maps spaces to underscores when slugifying section titles
+_SLUG = str.maketrans(' ', '_')
+
+# Longest section key, numeric suffix included (section_type is VARCHAR(50))
+MAX_SECTION_NAME_LENGTH = 50
+
+# One to three whitespace-separated words, e.g. "Min / Max" or "a/b c"
+_SHORT_TITLE = re.compile(r'\S+(?:\s+\S+){0,2}')
+
+# Upper bound on worker processes used for pdfplumber table extraction
+MAX_PDF_WORKERS = os.cpu_count() or 1
+
+_pdf_pool = None
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Create the table-extraction process pool on first use and reuse it.
+
+    Workers are spawned rather than forked: forking would copy the
+    extraction threads, loaded model state and any locks other threads
+    hold at that moment into every worker.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=MAX_PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+
+def _reset_pdf_pool() -> None:
+    """Drop a broken pool so the next PDF starts a fresh one."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+def _count_pages(file_path: str) -> int:
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[List]:
+    """Extract tables from pages [start, stop) of a PDF, in page order.
+
+    Runs in a worker process, so it is a module-level function.
+    """
+    with pdfplumber.open(file_path) as pdf:
+        return [pdf.pages[i].extract_tables() for i in range(start, stop)]
+
+
 class UnstructuredExtractor(BaseExtractor):
     SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.pptx', '.txt', '.doc'}
     
     async def extract(self, file_path: str) -> ExtractedContent:
         loop = asyncio.get_event_loop()
 
-        pdf_tables = await loop.run_in_executor(
-            None,
-            self._extract_tables_with_pdfplumber,
-            file_path
-        )
-
-        elements = await loop.run_in_executor(
-            None, 
+        partitioned = loop.run_in_executor(
+            _CPU_POOL,
             partition,
             file_path
         )
 
+        # Table extraction runs in worker processes while partition parses
+        # the same file; only PDFs have pdfplumber tables to extract. The
+        # pool may start its workers while partition is running, which is
+        # only safe because they are spawned, not forked (see _get_pdf_pool)
+        if Path(file_path).suffix.lower() == '.pdf':
+            pdf_tables, elements = await asyncio.gather(
+                self._extract_tables_with_pdfplumber(file_path),
+                partitioned
+            )
+        else:
+            pdf_tables, elements = [], await partitioned
+
         organized = self._organize_elements(elements, pdf_tables)
 
         return ExtractedContent(
@@ -39,14 +112,33 @@ class UnstructuredExtractor(BaseExtractor):
         ext = Path(file_path).suffix.lower()
         return ext in self.SUPPORTED_EXTENSIONS
 
-    def _extract_tables_with_pdfplumber(self, file_path: str) -> List[Dict]:
+    async def _extract_tables_with_pdfplumber(self, file_path: str) -> List[Dict]:
         tables = []
 
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_tables = page.extract_tables()
+            # Page extraction is CPU-bound and independent per page, so split
+            # the document into contiguous page ranges and run them in worker
+            # processes. Each worker opens the PDF once for its whole range.
+            loop = asyncio.get_running_loop()
+            page_count = await loop.run_in_executor(_CPU_POOL, _count_pages, file_path)
+            if page_count == 0:
+                return tables
+
+            workers = min(MAX_PDF_WORKERS, page_count)
+            step = -(-page_count // workers)
+            pool = _get_pdf_pool()
+            page_ranges = await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool, _extract_page_range, file_path, start,
+                    min(start + step, page_count)
+                )
+                for start in range(0, page_count, step)
+            ))
 
+            page_num = 0
+            for page_range in page_ranges:
+                for page_tables in page_range:
+                    page_num += 1
                     for table_num, table in enumerate(page_tables, 1):
                         if table:
                             # Convert table to text representation
@@ -62,6 +154,10 @@ class UnstructuredExtractor(BaseExtractor):
                                     'columns': len(table[0]) if table else 0
                                 }
                             })
+        except BrokenProcessPool as e:
+            # A dead worker breaks the pool for good; replace it
+            _reset_pdf_pool()
+            print(f"Warning: pdfplumber table extraction failed: {e}")
         except Exception as e:
             print(f"Warning: pdfplumber table extraction failed: {e}")
 
@@ -73,73 +169,65 @@ class UnstructuredExtractor(BaseExtractor):
             return ""
 
         # Filter out None values and convert to strings
-        cleaned_table = []
-        for row in table:
-            cleaned_row = [str(cell) if cell is not None else "" for cell in row]
-            cleaned_table.append(cleaned_row)
-
-        # Calculate column widths
-        if not cleaned_table:
-            return ""
+        cleaned_table = [
+            [str(cell) if cell is not None else "" for cell in row]
+            for row in table
+        ]
 
-        col_widths = [0] * len(cleaned_table[0])
-        for row in cleaned_table:
-            for i, cell in enumerate(row):
-                col_widths[i] = max(col_widths[i], len(cell))
+        # Calculate column widths column-wise; zip_longest pads ragged rows
+        col_widths = [
+            max(map(len, column))
+            for column in zip_longest(*cleaned_table, fillvalue="")
+        ]
 
         # Format table as text
-        lines = []
-        for row in cleaned_table:
-            formatted_row = " | ".join(cell.ljust(col_widths[i]) for i, cell in enumerate(row))
-            lines.append(formatted_row)
+        lines = [
+            " | ".join(cell.ljust(width) for cell, width in zip(row, col_widths))
+            for row in cleaned_table
+        ]
 
         return "\n".join(lines)
     
     def _organize_elements(self, elements, pdf_tables: List[Dict]) -> Dict:
-        sections = {}
+        sections = defaultdict(list)
         all_text = []
         current_section = 'introduction'
         sections[current_section] = []
 
         # Colect table cells to filter them out 
-        table_cells = set()
-        for table in pdf_tables:
-            for row in table.get('data', []):
-                for cell in row:
-                    if cell:
-                        table_cells.add(str(cell).strip().lower())
+        table_cells = {
+            str(cell).strip().lower()
+            for table in pdf_tables
+            for row in table.get('data', [])
+            for cell in row
+            if cell
+        }
 
         for element in elements:
             element_type = type(element).__name__
             element_text = element.text.strip()
+            lowered = element_text.lower()
 
-            if element_text.lower() in table_cells:
+            if lowered in table_cells:
                 continue
 
             if element_type == 'Title':
-                slash_count = element_text.count('/')
-                word_count = len(element_text.split())
-
-                # Skip if it looks like concatenated table cells
-                if slash_count >= 1 and word_count <= 3:
+                # Skip if it looks like concatenated table cells: a slash
+                # and no more than three words
+                if '/' in element_text and _SHORT_TITLE.fullmatch(element_text):
                     continue
 
                 # Only create section if title is substantial
                 if len(element_text) > 3:
-                    section_name = element_text.lower().replace(' ', '_')
-                    current_section = section_name
-                    sections[current_section] = []
+                    section_name = lowered.translate(_SLUG)
+                    current_section = self._start_section(sections, section_name)
                     all_text.append(element_text)
 
             elif element_type == 'NarrativeText':
-                if current_section not in sections:
-                    sections[current_section] = []
                 sections[current_section].append(element_text)
                 all_text.append(element_text)
 
             elif element_type == 'ListItem':
-                if current_section not in sections:
-                    sections[current_section] = []
                 sections[current_section].append(element_text)
                 all_text.append(element_text)
 
@@ -147,7 +235,7 @@ class UnstructuredExtractor(BaseExtractor):
             all_text.append(table['text'])
 
         return {
-            'sections': sections,
+            'sections': dict(sections),
             'tables': pdf_tables,
             'metadata': {
                 'total_sections': len(sections),
@@ -156,6 +244,20 @@ class UnstructuredExtractor(BaseExtractor):
             'full_text': '\n\n'.join(all_text)
         }
         
+    @staticmethod
+    def _start_section(sections: Dict[str, List[str]], name: str) -> str:
+        """Add an empty section and return its key, suffixing reused names"""
+        key = name[:MAX_SECTION_NAME_LENGTH]
+        suffix = 2
+        # Only a section that already has content would lose it
+        while sections.get(key):
+            # Shorten the name so the suffixed key still fits
+            tail = f"_{suffix}"
+            key = name[:MAX_SECTION_NAME_LENGTH - len(tail)] + tail
+            suffix += 1
+        sections[key] = []
+        return key
+
     def _extract_element_metadata(self, element):
         if hasattr(element, 'metadata') and element.metadata:
             if hasattr(element.metadata, 'to_dict'):